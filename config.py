@@ -1,3 +1,4 @@
+import json
 import random
 import time
 import tkinter as tk
@@ -27,6 +28,149 @@ EXPLORED_NEW_TILE = 10                  # +10 for visiting a new tile
 MOUSE_COLLISION = -10                   # -10 for colliding with another mouse
 
 
+class PhaseProfiler:
+    """
+    Optional timing/counter collector for the engine.
+
+    The game loop in mouse_ai.py does not create one; drive the engine from
+    a separate script instead:
+
+        profiler = PhaseProfiler()
+        env = Environment(canvas, profiler=profiler)
+        for _ in range(TURNS):
+            env.randomly_add_dirt()
+            env.perform_actions(actionA, actionB, performance_two_mice)
+        profiler.write_json("profile.json")
+        profiler.write_collapsed("profile.folded")
+
+    Phases recorded:
+
+        spawn                       randomly_add_dirt
+        turn;movement               _apply_movement for both mice
+        turn;collision              collision check + bounce resolution
+        turn;scoring                performance function for both mice
+        turn;scoring;status_callback   GUI status callback
+        turn;render                 update_grid (drawing only)
+        turn;render;sleep           the fixed 0.5 s pacing delay in update_grid
+
+    "turn" is perform_actions only. spawn is its own root frame because
+    randomly_add_dirt is called from the game loop, but each per-turn record
+    closes at the end of perform_actions and so includes the spawn that came
+    before it. The self time of "turn" is mostly the profiler's own
+    bookkeeping between phases, not engine work.
+
+    Render self time excludes the pacing sleep, so turn;render is the cost of
+    drawing; turn;render;sleep is a constant and can be ignored.
+
+    Counters (cumulative and per turn, always all four keys):
+
+        moves        move actions attempted (UP/DOWN/LEFT/RIGHT), including
+                     ones that bumped into a wall
+        bumps        move actions that did not change position (wall)
+        collisions   turns where both mice landed on the same tile
+        eats         successful eats; counted by performance_two_mice, so
+                     this stays 0 with any other performance function
+
+    Phases nest, so a phase's cumulative time includes its children while
+    its "self" time does not. When no profiler is given the engine only
+    pays for an `is not None` check per phase.
+
+    Results can be exported as JSON (to_json / write_json) or in the
+    collapsed-stack format read by flamegraph.pl and speedscope
+    (to_collapsed / write_collapsed).
+    """
+
+    def __init__(self):
+        self.cumulative = {}     # phase path -> total seconds (incl. children)
+        self.self_time = {}      # phase path -> total seconds (excl. children)
+        self.calls = {}          # phase path -> number of times entered
+        self.counters = self._empty_counters()
+        self.turns = []          # one {"phases": ..., "counters": ...} per turn
+
+        self._stack = []         # [path, start_time, child_seconds]
+        self._turn_phases = {}
+        self._turn_counters = self._empty_counters()
+
+    def _empty_counters(self):
+        return {"moves": 0, "bumps": 0, "collisions": 0, "eats": 0}
+
+    def enter(self, name):
+        """Start timing a phase, nested under the currently open phase (if any)."""
+        if self._stack:
+            path = self._stack[-1][0] + ";" + name
+        else:
+            path = name
+        self._stack.append([path, time.perf_counter(), 0.0])
+
+    def exit(self):
+        """Stop timing the most recently entered phase."""
+        path, start, child_seconds = self._stack.pop()
+        elapsed = time.perf_counter() - start
+
+        self.cumulative[path] = self.cumulative.get(path, 0.0) + elapsed
+        self.self_time[path] = self.self_time.get(path, 0.0) + elapsed - child_seconds
+        self.calls[path] = self.calls.get(path, 0) + 1
+        self._turn_phases[path] = self._turn_phases.get(path, 0.0) + elapsed
+
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def count(self, name, amount=1):
+        """Add `amount` to counter `name` (both cumulative and for this turn)."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+        self._turn_counters[name] = self._turn_counters.get(name, 0) + amount
+
+    def end_turn(self):
+        """Close the current turn and store its phase timings and counters."""
+        self.turns.append({
+            "phases": self._turn_phases,
+            "counters": self._turn_counters,
+        })
+        self._turn_phases = {}
+        self._turn_counters = self._empty_counters()
+
+    def to_dict(self):
+        """Return all collected data as plain dicts/lists (times in seconds)."""
+        phases = {}
+        for path in self.cumulative:
+            phases[path] = {
+                "calls": self.calls[path],
+                "cumulative": self.cumulative[path],
+                "self": self.self_time[path],
+            }
+        return {
+            "turns_recorded": len(self.turns),
+            "phases": phases,
+            "counters": dict(self.counters),
+            "turns": self.turns,
+        }
+
+    def to_json(self, indent=2):
+        """Return the collected data as a JSON string."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_collapsed(self):
+        """
+        Return the self time of every phase in collapsed-stack format,
+        one "frame;frame;frame <microseconds>" line per phase path.
+        """
+        lines = []
+        for path in sorted(self.self_time):
+            micros = int(round(self.self_time[path] * 1000000))
+            lines.append(f"{path} {micros}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, filename):
+        """Write to_json() to `filename`."""
+        with open(filename, "w") as f:
+            f.write(self.to_json())
+
+    def write_collapsed(self, filename):
+        """Write to_collapsed() to `filename`."""
+        with open(filename, "w") as f:
+            f.write(self.to_collapsed())
+
+
 class Environment:
     """
     Two-mouse environment on a shared grid.
@@ -47,7 +191,7 @@ class Environment:
         * mouse1.png for Mouse A, mouse2.png for Mouse B
     """
 
-    def __init__(self, canvas, mouse1_img=None, mouse2_img=None, status_callback=None):
+    def __init__(self, canvas, mouse1_img=None, mouse2_img=None, status_callback=None, profiler=None):
         # 0 = empty, 1 = food
         self.grid = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
 
@@ -66,6 +210,10 @@ class Environment:
         # Callback used to update GUI: status_callback(mouse_id, description_str, total_score)
         self.status_callback = status_callback
 
+        # Optional PhaseProfiler; None disables all instrumentation.
+        # Attached after the initial draw so construction is not profiled.
+        self.profiler = None
+
         # Storage for images (if available)
         self.image_ids = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
 
@@ -98,17 +246,25 @@ class Environment:
         self.mouse_text_ids = {"A": None, "B": None}
 
         self.draw_grid()
+        self.profiler = profiler
 
     def randomly_add_dirt(self):
         """
         Randomly add food to the grid.
         (Name kept for backward compatibility; conceptually this is "randomly add food".)
         """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter("spawn")
+
         for i in range(GRID_SIZE):
             for j in range(GRID_SIZE):
                 if random.random() < DIRT_PROB:
                     self.grid[i][j] = 1  # 1 means the tile has food
 
+        if profiler is not None:
+            profiler.exit()
+
     def _apply_movement(self, mouse_id, action):
         x, y = self.mouse_pos[mouse_id]
 
@@ -131,6 +287,11 @@ class Environment:
           the food disappears but neither mouse gets the reward.
         - If both mice collide, they are bounced back two spaces unless out of bounds.
         """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter("turn")
+            profiler.enter("movement")
+
         # Save previous positions (for wall-bump / out-of-bounds penalties)
         prevA = tuple(self.mouse_pos["A"])
         prevB = tuple(self.mouse_pos["B"])
@@ -139,11 +300,22 @@ class Environment:
         self._apply_movement("A", actionA)
         self._apply_movement("B", actionB)
 
+        if profiler is not None:
+            for action, mouse_id, prev_pos in [(actionA, "A", prevA), (actionB, "B", prevB)]:
+                if action in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
+                    profiler.count("moves")
+                    if tuple(self.mouse_pos[mouse_id]) == prev_pos:
+                        profiler.count("bumps")
+            profiler.exit()
+            profiler.enter("collision")
+
         # 2) Check if they collide
         collision = False
         if self.mouse_pos["A"] == self.mouse_pos["B"]:
             r, c = self.mouse_pos["A"]
             collision = True
+            if profiler is not None:
+                profiler.count("collisions")
 
             # Bounce both mice back two spaces unless out of bounds
             for mouse_id, prev_pos in [("A", prevA), ("B", prevB)]:
@@ -159,6 +331,10 @@ class Environment:
                     self.mouse_pos[mouse_id] = [max(0, min(GRID_SIZE - 1, new_r)),
                                                 max(0, min(GRID_SIZE - 1, new_c))]
 
+        if profiler is not None:
+            profiler.exit()
+            profiler.enter("scoring")
+
         # 3) Apply scoring independently
         deltaA = performance_function(
             self, actionA, prevA,
@@ -174,9 +350,18 @@ class Environment:
         self.score["A"] += deltaA
         self.score["B"] += deltaB
 
+        if profiler is not None:
+            profiler.exit()
+            profiler.enter("render")
+
         # 4) Update visuals
         self.update_grid()
 
+        if profiler is not None:
+            profiler.exit()
+            profiler.exit()
+            profiler.end_turn()
+
     def count_ones(self):
         """Count how many food tiles remain (i.e., how many 1's are in the grid)."""
         return sum(row.count(1) for row in self.grid)
@@ -281,7 +466,12 @@ class Environment:
                 )
 
         self.canvas.update()
+
+        if self.profiler is not None:
+            self.profiler.enter("sleep")
         time.sleep(.5)
+        if self.profiler is not None:
+            self.profiler.exit()
 
 
 def performance_two_mice(env, action, prev_pos, mouse_id, collision=False):
@@ -308,6 +498,8 @@ def performance_two_mice(env, action, prev_pos, mouse_id, collision=False):
     x, y = env.mouse_pos[mouse_id]
     tile_has_food = (env.grid[x][y] == 1)
 
+    profiler = env.profiler
+
     # ---------- COLLISION ----------
     if collision:
         score += MOUSE_COLLISION
@@ -322,6 +514,8 @@ def performance_two_mice(env, action, prev_pos, mouse_id, collision=False):
             env.grid[x][y] = 0
             env.consecutive_clean_count[mouse_id] += 1
             log.append(f"ATE_FOOD +{ATE_FOOD}")
+            if profiler is not None:
+                profiler.count("eats")
 
             if env.consecutive_clean_count[mouse_id] % 3 == 0:
                 score += STREAK_BONUS
@@ -375,6 +569,10 @@ def performance_two_mice(env, action, prev_pos, mouse_id, collision=False):
         desc = " | ".join(desc_parts)
 
         total_score = env.score[mouse_id] + score
+        if profiler is not None:
+            profiler.enter("status_callback")
         env.status_callback(mouse_id, desc, total_score)
+        if profiler is not None:
+            profiler.exit()
 
     return score